@@ -5,6 +5,17 @@ This module provides functionality to convert a Context-Free Grammar (CFG)
 to Chomsky Normal Form (CNF).
 """
 
+import sys
+from collections import deque
+from functools import lru_cache
+from itertools import combinations
+
+
+def _intern(symbol):
+    """Intern string symbols so dictionary lookups compare by identity."""
+    return sys.intern(symbol) if isinstance(symbol, str) else symbol
+
+
 class CFG:
     """
     Class representing a Context-Free Grammar.
@@ -16,20 +27,63 @@ class CFG:
         Args:
             variables (set): Set of non-terminal symbols (variables)
             terminals (set): Set of terminal symbols
-            productions (dict): Dictionary mapping variables to lists of productions
+            productions (dict): Dictionary mapping variables to lists of productions.
+                Each production is either a tuple of symbols or a string, which
+                is split into the longest matching variables and terminals.
+                The empty string or tuple denotes epsilon.
             start_symbol: The start symbol of the grammar
         """
-        self.variables = variables
-        self.terminals = terminals
-        self.productions = productions
-        self.start_symbol = start_symbol
+        self.variables = {_intern(var) for var in variables}
+        self.terminals = {_intern(terminal) for terminal in terminals}
+        
+        # Build the lexicon once rather than per production string
+        lexicon = self.variables | self.terminals
+        max_len = max((len(symbol) for symbol in lexicon if isinstance(symbol, str)), default=1)
+        self.productions = {
+            _intern(var): [self.tokenize(prod, lexicon, max_len) for prod in prods]
+            for var, prods in productions.items()
+        }
+        self.start_symbol = _intern(start_symbol)
+    
+    def tokenize(self, production, lexicon=None, max_len=None):
+        """
+        Split a production string into a tuple of symbols.
+        
+        Args:
+            production: A production string, or an already tokenized sequence
+            lexicon (set, optional): Known symbols, defaults to the variables
+                and terminals of the grammar
+            max_len (int, optional): Length of the longest symbol in lexicon
+        
+        Returns:
+            tuple: The symbols of the production
+        """
+        if not isinstance(production, str):
+            return tuple(_intern(symbol) for symbol in production)
+        
+        if lexicon is None:
+            lexicon = self.variables | self.terminals
+        if max_len is None:
+            max_len = max((len(symbol) for symbol in lexicon if isinstance(symbol, str)), default=1)
+        symbols = []
+        i = 0
+        
+        while i < len(production):
+            # Take the longest known symbol, falling back to a single character
+            for length in range(min(max_len, len(production) - i), 0, -1):
+                if production[i:i + length] in lexicon:
+                    break
+            symbols.append(_intern(production[i:i + length]))
+            i += length
+        
+        return tuple(symbols)
     
     def __str__(self):
         """String representation of the CFG."""
         result = []
         for variable, productions in self.productions.items():
             for production in productions:
-                result.append(f"{variable} -> {production}")
+                result.append(f"{variable} -> {' '.join(production) or 'ε'}")
         return "\n".join(result)
 
 
@@ -47,6 +101,7 @@ class CNFConverter:
         self.cfg = cfg
         self.new_var_counter = 0
         self.terminal_to_var = {}  # Maps terminals to their variable representatives
+        self.suffix_cache = {}  # Maps suffix-chain rules to the variables deriving them
     
     def generate_new_variable(self):
         """
@@ -59,196 +114,310 @@ class CNFConverter:
             new_var = f"X{self.new_var_counter}"
             self.new_var_counter += 1
             if new_var not in self.cfg.variables:
-                return new_var
+                return _intern(new_var)
     
-    def eliminate_epsilon_productions(self):
+    def suffix_variable(self, suffix, variables, productions):
         """
-        Eliminate epsilon productions from the grammar.
+        Get the variable deriving a suffix of a long production.
+        
+        Variables are shared between productions that end in the same suffix.
+        The suffix s1 s2 ... sk is derived by a chain of variables built from
+        the end: V -> s(k-1) sk, then V' -> s(k-2) V and so on. suffix_cache
+        maps each of these two-symbol rules to its variable, so equal
+        suffixes reuse the same chain and every step is a constant-time
+        lookup.
+        
+        Args:
+            suffix (tuple): The suffix, at least two symbols long
+            variables (set): Set of variables to register new variables in
+            productions (dict): Productions to add the new rules to
         
         Returns:
-            CFG: New CFG without epsilon productions
+            str: The variable deriving the suffix
+        """
+        var = None
+        for i in range(len(suffix) - 2, -1, -1):
+            rule = suffix[i:] if var is None else (suffix[i], var)
+            var = self.suffix_cache.get(rule)
+            if var is None:
+                var = self.generate_new_variable()
+                variables.add(var)
+                productions[var] = {rule}
+                self.suffix_cache[rule] = var
+        
+        return var
+    
+    def find_nullable_variables(self):
+        """
+        Find the variables that can derive the empty string.
+        
+        Nullability is propagated from the epsilon productions through the
+        productions containing each newly nullable variable, so every
+        production is examined once per distinct symbol in it.
+        
+        Returns:
+            set: The nullable variables
         """
         nullable = set()
+        queue = deque()
         
-        # Identify nullable variables
-        while True:
-            nullable_added = False
-            
-            for var, productions in self.cfg.productions.items():
-                if var in nullable:
+        # For every production made up only of variables, count the distinct
+        # variables in it not yet known to be nullable. Productions containing
+        # a terminal can never become nullable and are left out.
+        remaining = []
+        lhs = []
+        dependents = {}  # Maps variables to ids of productions containing them
+        
+        for var, productions in self.cfg.productions.items():
+            for prod in productions:
+                symbols = set(prod)
+                if not symbols <= self.cfg.variables:
                     continue
                 
-                # Check if this variable has an epsilon production or 
-                # if it has a production with all nullable variables
-                if "" in productions:
-                    nullable.add(var)
-                    nullable_added = True
-                else:
-                    for prod in productions:
-                        if all(symbol in nullable for symbol in prod):
-                            nullable.add(var)
-                            nullable_added = True
-                            break
-            
-            if not nullable_added:
-                break
+                if not symbols:  # Epsilon production
+                    if var not in nullable:
+                        nullable.add(var)
+                        queue.append(var)
+                    continue
+                
+                prod_id = len(remaining)
+                remaining.append(len(symbols))
+                lhs.append(var)
+                for symbol in symbols:
+                    dependents.setdefault(symbol, []).append(prod_id)
+        
+        # Identify nullable variables by propagating from epsilon productions
+        while queue:
+            symbol = queue.popleft()
+            for prod_id in dependents.get(symbol, []):
+                remaining[prod_id] -= 1
+                if remaining[prod_id] == 0 and lhs[prod_id] not in nullable:
+                    nullable.add(lhs[prod_id])
+                    queue.append(lhs[prod_id])
+        
+        return nullable
+    
+    def eliminate_epsilon_productions(self):
+        """
+        Eliminate epsilon productions from the grammar.
+        
+        Returns:
+            CFG: New CFG without epsilon productions
+        """
+        nullable = self.find_nullable_variables()
         
         # Generate new productions
-        new_productions = {var: [] for var in self.cfg.variables}
+        new_productions = {var: set() for var in self.cfg.variables}
         
         for var, productions in self.cfg.productions.items():
             for prod in productions:
-                if prod == "":  # Skip epsilon productions
+                if not prod:  # Skip epsilon productions
+                    continue
+                
+                # Productions without nullable symbols are kept as they are
+                if nullable.isdisjoint(prod):
+                    new_productions[var].add(prod)
                     continue
                 
                 # Generate all possible combinations by omitting nullable variables
                 nullable_indices = [i for i, symbol in enumerate(prod) if symbol in nullable]
-                num_combinations = 2 ** len(nullable_indices)
                 
-                for i in range(num_combinations):
-                    # Determine which nullable variables to omit
-                    omit = []
-                    for j, idx in enumerate(nullable_indices):
-                        if (i >> j) & 1:
-                            omit.append(idx)
-                    
-                    # Create the new production by omitting specified nullable variables
-                    new_prod = "".join(prod[j] for j in range(len(prod)) if j not in omit)
-                    
-                    # Only add non-empty productions
-                    if new_prod and new_prod not in new_productions[var]:
-                        new_productions[var].append(new_prod)
+                for r in range(len(nullable_indices) + 1):
+                    for omit in combinations(nullable_indices, r):
+                        # Create the new production by omitting specified nullable variables
+                        omit = frozenset(omit)
+                        new_prod = tuple(symbol for j, symbol in enumerate(prod) if j not in omit)
+                        
+                        # Only add non-empty productions
+                        if new_prod:
+                            new_productions[var].add(new_prod)
         
         # Handle the case where the start symbol is nullable
         if self.cfg.start_symbol in nullable:
             # Create a new start symbol that can derive epsilon
             new_start = self.generate_new_variable()
-            new_productions[new_start] = ["", self.cfg.start_symbol]
-            self.cfg.variables.add(new_start)
+            new_productions[new_start] = {(), (self.cfg.start_symbol,)}
+            variables = self.cfg.variables | {new_start}
             new_start_symbol = new_start
         else:
+            variables = self.cfg.variables
             new_start_symbol = self.cfg.start_symbol
         
-        return CFG(self.cfg.variables, self.cfg.terminals, new_productions, new_start_symbol)
+        new_productions = {var: list(prods) for var, prods in new_productions.items()}
+        return CFG(variables, self.cfg.terminals, new_productions, new_start_symbol)
     
-    def eliminate_unit_productions(self):
+    def eliminate_unit_productions(self, cfg=None):
         """
         Eliminate unit productions from the grammar.
         
+        Args:
+            cfg (CFG, optional): The grammar to transform, defaults to the
+                converter's grammar
+        
         Returns:
             CFG: New CFG without unit productions
         """
-        # Build unit pairs
-        unit_pairs = {var: {var} for var in self.cfg.variables}
-        
-        # Compute the closure of unit pairs
-        changed = True
-        while changed:
-            changed = False
-            for A in self.cfg.variables:
-                for B in list(unit_pairs[A]):
-                    for prod in self.cfg.productions.get(B, []):
-                        if prod in self.cfg.variables and prod not in unit_pairs[A]:
-                            unit_pairs[A].add(prod)
-                            changed = True
+        if cfg is None:
+            cfg = self.cfg
+        
+        # Index the variables so unit pairs can be stored as bitsets:
+        # bit j of reach[i] is set iff variables[j] is reachable from
+        # variables[i] through unit productions
+        variables = list(cfg.variables)
+        index = {var: i for i, var in enumerate(variables)}
+        reach = [1 << i for i in range(len(variables))]
+        
+        # Split productions into unit edges and the remaining productions
+        unit_successors = [[] for _ in variables]
+        non_unit = {var: [] for var in variables}
+        for var, prods in cfg.productions.items():
+            if var not in index:
+                continue
+            for prod in prods:
+                if len(prod) == 1 and prod[0] in index:
+                    unit_successors[index[var]].append(index[prod[0]])
+                else:
+                    non_unit[var].append(prod)
+        
+        # Compute the closure of unit pairs, only following newly added pairs
+        work = deque((i, i) for i in range(len(variables)) if unit_successors[i])
+        while work:
+            A, B = work.popleft()
+            for C in unit_successors[B]:
+                if not reach[A] >> C & 1:
+                    reach[A] |= 1 << C
+                    work.append((A, C))
         
         # Create new productions
-        new_productions = {var: [] for var in self.cfg.variables}
-        
-        for A in self.cfg.variables:
-            for B in unit_pairs[A]:
-                for prod in self.cfg.productions.get(B, []):
-                    # Skip unit productions
-                    if prod in self.cfg.variables:
-                        continue
-                    
-                    if prod not in new_productions[A]:
-                        new_productions[A].append(prod)
-        
-        return CFG(self.cfg.variables, self.cfg.terminals, new_productions, self.cfg.start_symbol)
+        new_productions = {var: set() for var in variables}
+        
+        for i, A in enumerate(variables):
+            bits = reach[i]
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                new_productions[A].update(non_unit[variables[low.bit_length() - 1]])
+        
+        new_productions = {var: list(prods) for var, prods in new_productions.items()}
+        return CFG(cfg.variables, cfg.terminals, new_productions, cfg.start_symbol)
     
     def convert_to_cnf(self):
         """
         Convert the CFG to Chomsky Normal Form.
         
+        Conversions are cached by grammar, so converting an equal grammar
+        again returns a fresh copy of the earlier result. The converter's
+        terminal_to_var, suffix_cache and new_var_counter are set to the
+        state the conversion left them in, as convert_to_cnf_uncached does.
+        
+        Returns:
+            CFG: The grammar in CNF
+        """
+        key = (
+            frozenset(self.cfg.variables),
+            frozenset(self.cfg.terminals),
+            frozenset((var, frozenset(prods)) for var, prods in self.cfg.productions.items()),
+            self.cfg.start_symbol,
+        )
+        cnf, state = _convert_cached(key)
+        variables, terminals, productions, start_symbol = cnf
+        terminal_to_var, suffix_cache, self.new_var_counter = state
+        self.terminal_to_var = dict(terminal_to_var)
+        self.suffix_cache = dict(suffix_cache)
+        
+        return CFG(set(variables), set(terminals),
+                   {var: list(prods) for var, prods in productions}, start_symbol)
+    
+    def convert_to_cnf_uncached(self):
+        """
+        Convert the CFG to Chomsky Normal Form without consulting the cache.
+        
         Returns:
             CFG: The grammar in CNF
         """
+        # Every conversion starts from fresh variable names and mappings
+        self.new_var_counter = 0
+        self.terminal_to_var = {}
+        self.suffix_cache = {}
+        
         # Step 1: Eliminate epsilon productions
         cfg = self.eliminate_epsilon_productions()
         
-        # Step 2: Eliminate unit productions
-        cfg = self.eliminate_unit_productions()
+        # Step 2: Eliminate unit productions from the epsilon-free grammar
+        cfg = self.eliminate_unit_productions(cfg)
         
-        # Step 3: Replace terminals in productions with length > 2
+        # Steps 3 and 4: Replace terminals in mixed productions and break
+        # down productions with length > 2, in a single pass
         variables = cfg.variables.copy()
         terminals = cfg.terminals.copy()
-        productions = {var: [] for var in variables}
+        final_productions = {var: set() for var in variables}
         
-        # Copy existing productions first
         for var, prods in cfg.productions.items():
-            productions[var] = prods.copy()
-        
-        # Replace terminals in mixed productions
-        for var, prods in cfg.productions.items():
-            new_prods = []
             for prod in prods:
-                # Skip if this is already in CNF
+                # Keep productions already in CNF
                 if len(prod) <= 1 or (len(prod) == 2 and prod[0] in variables and prod[1] in variables):
+                    final_productions[var].add(prod)
                     continue
                 
                 # Replace terminals with new variables
-                new_prod = ""
+                new_prod = []
                 for symbol in prod:
                     if symbol in terminals:
                         if symbol not in self.terminal_to_var:
                             new_var = self.generate_new_variable()
                             self.terminal_to_var[symbol] = new_var
                             variables.add(new_var)
-                            productions[new_var] = [symbol]
-                        new_prod += self.terminal_to_var[symbol]
+                            final_productions[new_var] = {(symbol,)}
+                        new_prod.append(self.terminal_to_var[symbol])
                     else:
-                        new_prod += symbol
+                        new_prod.append(symbol)
                 
-                new_prods.append(new_prod)
-            
-            # Add the new productions
-            for prod in new_prods:
-                if prod not in productions[var]:
-                    productions[var].append(prod)
-        
-        # Step 4: Break down productions with length > 2
-        final_productions = {var: [] for var in variables}
-        
-        for var, prods in productions.items():
-            for prod in prods:
-                if len(prod) <= 2:
-                    # Keep productions already in CNF
-                    if prod not in final_productions[var]:
-                        final_productions[var].append(prod)
+                if len(new_prod) <= 2:
+                    final_productions[var].add(tuple(new_prod))
                 else:
-                    # Break down long productions
-                    current_var = var
-                    for i in range(len(prod) - 2):
-                        next_var = self.generate_new_variable()
-                        variables.add(next_var)
-                        final_productions[next_var] = []
-                        
-                        if i == 0:
-                            final_productions[current_var].append(prod[0] + next_var)
-                        else:
-                            final_productions[current_var].append(prev_var + next_var)
-                        
-                        if i == len(prod) - 3:
-                            final_productions[next_var].append(prod[-2] + prod[-1])
-                        
-                        prev_var = next_var
-                        current_var = next_var
+                    # Break down long productions, sharing common suffixes
+                    suffix_var = self.suffix_variable(tuple(new_prod[1:]), variables, final_productions)
+                    final_productions[var].add((new_prod[0], suffix_var))
         
         # Return the final CFG in CNF
+        final_productions = {var: list(prods) for var, prods in final_productions.items()}
         return CFG(variables, terminals, final_productions, cfg.start_symbol)
 
 
+@lru_cache(maxsize=128)
+def _convert_cached(key):
+    """
+    Convert a frozen grammar to Chomsky Normal Form.
+    
+    Args:
+        key (tuple): Frozen variables, terminals, productions and start symbol.
+            Frozensets are used throughout so symbols need not be orderable.
+    
+    Returns:
+        tuple: The CNF grammar in the same frozen form, and the converter's
+        terminal_to_var and suffix_cache items and new_var_counter after
+        the conversion
+    """
+    variables, terminals, productions, start_symbol = key
+    cfg = CFG(set(variables), set(terminals),
+              {var: list(prods) for var, prods in productions}, start_symbol)
+    converter = CNFConverter(cfg)
+    cnf = converter.convert_to_cnf_uncached()
+    
+    frozen_cnf = (
+        frozenset(cnf.variables),
+        frozenset(cnf.terminals),
+        tuple((var, tuple(prods)) for var, prods in cnf.productions.items()),
+        cnf.start_symbol,
+    )
+    state = (
+        tuple(converter.terminal_to_var.items()),
+        tuple(converter.suffix_cache.items()),
+        converter.new_var_counter,
+    )
+    return frozen_cnf, state
+
+
 # Example usage
 if __name__ == "__main__":
     # Example grammar
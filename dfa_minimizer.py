@@ -1,12 +1,45 @@
+import sys
+from collections import deque
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional, the pure Python paths are used instead
+    njit = None
+
+# Smallest DFA for which minimize() uses the Numba kernel when available
+JIT_MIN_STATES = 256
+
+# Most transitions a state's generated function in compile_runner() tests
+# with branches before switching to a dict lookup
+RUNNER_MAX_BRANCHES = 16
+
+
+def _intern(symbol):
+    # Interned strings make dictionary key comparisons identity checks
+    return sys.intern(symbol) if isinstance(symbol, str) else symbol
 
 
 class DFA:
     def __init__(self, states, alphabet, transitions, start_state, final_states):
-        self.states = states
-        self.alphabet = alphabet
-        self.transitions = transitions
-        self.start_state = start_state
-        self.final_states = final_states
+        self.states = {_intern(state) for state in states}
+        self.alphabet = {_intern(symbol) for symbol in alphabet}
+        self.transitions = {
+            (_intern(state), _intern(symbol)): _intern(next_state)
+            for (state, symbol), next_state in transitions.items()
+        }
+        self.start_state = _intern(start_state)
+        self.final_states = {_intern(state) for state in final_states}
+
+    def _successors(self):
+        # Successor table keyed by source state: state -> {symbol: next_state}.
+        # Built from the live transitions on every call, so in-place edits of
+        # self.transitions are always seen.
+        adj = {}
+        for (state, symbol), next_state in self.transitions.items():
+            adj.setdefault(state, {})[symbol] = next_state
+        return adj
 
     def __str__(self):
         """String representation of the DFA."""
@@ -16,18 +49,120 @@ class DFA:
                 f"Start State: {self.start_state}\n"
                 f"Final States: {self.final_states}")
 
+    def accepts(self, input_string):
+        """Check if the DFA accepts the given input string."""
+        state = self.start_state
+        for symbol in input_string:
+            if (state, symbol) not in self.transitions:
+                return False
+            state = self.transitions[(state, symbol)]
+        return state in self.final_states
+
+    def compile_runner(self):
+        """
+        Generate a specialized acceptance function for this DFA.
+        
+        Each state gets a small generated function that maps a symbol to the
+        next state number through if/elif branches, or through a bound dict
+        when it has more than RUNNER_MAX_BRANCHES transitions. The runner
+        dispatches on the current state through a tuple of these functions,
+        so each symbol costs the same regardless of the number of states.
+        This is an optional fast path; accepts() gives the same answers.
+        
+        Returns:
+            function: A function taking an input string and returning True
+            if the DFA accepts it
+        """
+        states = list(self.states)
+        state_idx = {state: i for i, state in enumerate(states)}
+        adj = self._successors()
+        symbols = list(self.alphabet)
+        sym_idx = {symbol: i for i, symbol in enumerate(symbols)}
+        
+        # Symbols are bound as default arguments so the generated code
+        # compares against fast locals and works for any hashable symbol
+        namespace = {f"_c{i}": symbol for i, symbol in enumerate(symbols)}
+        lines = []
+        for i, state in enumerate(states):
+            branches = adj.get(state, {})
+            if len(branches) > RUNNER_MAX_BRANCHES:
+                namespace[f"_t{i}"] = {symbol: state_idx[next_state]
+                                       for symbol, next_state in branches.items()}
+                lines.append(f"def _s{i}(c, _get=_t{i}.get):")
+                lines.append("    return _get(c, -1)")
+                continue
+            
+            params = "".join(f", _c{sym_idx[symbol]}=_c{sym_idx[symbol]}" for symbol in branches)
+            lines.append(f"def _s{i}(c{params}):")
+            for symbol, next_state in branches.items():
+                lines.append(f"    if c == _c{sym_idx[symbol]}:")
+                lines.append(f"        return {state_idx[next_state]}")
+            lines.append("    return -1")
+        
+        exec(compile("\n".join(lines), "<dfa>", "exec"), namespace)
+        namespace["_step"] = tuple(namespace[f"_s{i}"] for i in range(len(states)))
+        namespace["_finals"] = frozenset(state_idx[state] for state in self.final_states)
+        
+        source = "\n".join([
+            "def run(input_string, _step=_step, _finals=_finals):",
+            f"    st = {state_idx[self.start_state]}",
+            "    for c in input_string:",
+            "        st = _step[st](c)",
+            "        if st < 0:",
+            "            return False",
+            "    return st in _finals",
+        ])
+        exec(compile(source, "<dfa>", "exec"), namespace)
+        return namespace["run"]
+
+    def compile(self):
+        """
+        Freeze the transition function into integer arrays.
+        
+        Returns:
+            tuple: (T, sym_map, start, final_mask) where T[state, symbol] is
+            the next state or -1, sym_map maps symbols to columns of T, start
+            is the start state's row and final_mask flags accepting rows
+        """
+        states = list(self.states)
+        state_idx = {state: i for i, state in enumerate(states)}
+        sym_map = {symbol: i for i, symbol in enumerate(self.alphabet)}
+        
+        T = np.full((len(states), len(sym_map)), -1, dtype=np.int32)
+        for (state, symbol), next_state in self.transitions.items():
+            T[state_idx[state], sym_map[symbol]] = state_idx[next_state]
+        
+        final_mask = np.array([state in self.final_states for state in states], dtype=np.bool_)
+        
+        return T, sym_map, state_idx[self.start_state], final_mask
+
+    @staticmethod
+    def accepts_compiled(compiled, input_string):
+        """Check if a DFA frozen by compile() accepts the given input string."""
+        T, sym_map, start, final_mask = compiled
+        symbols = np.fromiter((sym_map.get(symbol, -1) for symbol in input_string),
+                              dtype=np.int32)
+        return bool(_run_compiled(T, start, final_mask, symbols))
+
+    def _inverse(self):
+        # symbol -> next_state -> list of predecessors, built in one pass
+        # over the live transitions
+        inv = {}
+        for (state, symbol), next_state in self.transitions.items():
+            inv.setdefault(symbol, {}).setdefault(next_state, []).append(state)
+        return inv
+
     def get_accessible_states(self):
         accessible = {self.start_state}
-        queue = [self.start_state]
+        queue = deque([self.start_state])
+        adj = self._successors()
         
         while queue:
-            state = queue.pop(0)
-            for symbol in self.alphabet:
-                if (state, symbol) in self.transitions:
-                    next_state = self.transitions[(state, symbol)]
-                    if next_state not in accessible:
-                        accessible.add(next_state)
-                        queue.append(next_state)
+            state = queue.popleft()
+            for next_state in adj.get(state, {}).values():
+                if next_state not in accessible:
+                    accessible.add(next_state)
+                    queue.append(next_state)
         
         return accessible
 
@@ -55,61 +190,218 @@ class DFA:
         if len(dfa.states) <= 1:
             return dfa
         
-        partition = []
-        accepting = dfa.final_states
-        non_accepting = dfa.states - accepting
-        
-        if accepting:
-            partition.append(accepting)
-        if non_accepting:
-            partition.append(non_accepting)
-        
-        # Refine the partition until it stabilizes
-        while True:
-            new_partition = refine_partition(dfa, partition)
-            if new_partition == partition:
-                break
-            partition = new_partition
+        if _refine_blocks is not None and len(dfa.states) >= JIT_MIN_STATES:
+            partition = hopcroft_partition_jit(dfa)
+        else:
+            partition = hopcroft_partition(dfa)
         
         # Create new DFA based on the minimized partition
         return create_minimized_dfa(dfa, partition)
 
 
-def refine_partition(dfa, partition):
-    result = []
+def hopcroft_partition(dfa):
+    # Inverse transitions are built once and reused by every splitter
+    inv = dfa._inverse()
+    
+    # Hopcroft's algorithm, starting from the accepting / non-accepting split
+    partition = []
+    accepting = dfa.final_states
+    non_accepting = dfa.states - accepting
+    
+    if accepting:
+        partition.append(set(accepting))
+    if non_accepting:
+        partition.append(set(non_accepting))
     
-    for group in partition:
-        # For each group in the partition
-        subgroups = {}
+    block_of = {state: i for i, group in enumerate(partition) for state in group}
+    
+    # Worklist of (block, symbol) splitters. Both initial blocks are queued
+    # since a partial DFA has no implicit complement to split against.
+    worklist = {(i, symbol) for i in range(len(partition)) for symbol in dfa.alphabet}
+    
+    while worklist:
+        splitter, symbol = worklist.pop()
         
-        for state in group:
-            # Compute the signature of this state
-            signature = []
-            for symbol in dfa.alphabet:
-                if (state, symbol) in dfa.transitions:
-                    next_state = dfa.transitions[(state, symbol)]
-                    # Find which group in partition contains the next_state
-                    for i, p in enumerate(partition):
-                        if next_state in p:
-                            signature.append((symbol, i))
-                            break
-                else:
-                    # No transition on this symbol
-                    signature.append((symbol, -1))
+        # States that move into the splitter on this symbol, grouped by block
+        touched = {}
+        inv_symbol = inv.get(symbol, {})
+        for target in partition[splitter]:
+            for state in inv_symbol.get(target, ()):
+                touched.setdefault(block_of[state], set()).add(state)
+        
+        for block, inside in touched.items():
+            group = partition[block]
+            if len(inside) == len(group):
+                continue
             
-            # Convert list to tuple for hashing
-            signature = tuple(signature)
+            # Split the block; the smaller half becomes the new block
+            outside = group - inside
+            if len(inside) <= len(outside):
+                smaller, larger = inside, outside
+            else:
+                smaller, larger = outside, inside
+            partition[block] = larger
+            new_block = len(partition)
+            partition.append(smaller)
+            for state in smaller:
+                block_of[state] = new_block
             
-            # Add state to the appropriate subgroup
-            if signature not in subgroups:
-                subgroups[signature] = set()
-            subgroups[signature].add(state)
-        
-        # Add each subgroup to the result
-        for subgroup in subgroups.values():
-            result.append(subgroup)
+            # If the old block was pending it now covers only the larger
+            # half, so the smaller half is always queued as well
+            for a in dfa.alphabet:
+                worklist.add((new_block, a))
+    
+    return partition
+
+
+def hopcroft_partition_jit(dfa):
+    # Without Numba there is no kernel to run
+    if _refine_blocks is None:
+        return hopcroft_partition(dfa)
+    
+    # Encode states and symbols as contiguous integers
+    states = list(dfa.states)
+    state_idx = {state: i for i, state in enumerate(states)}
+    sym_idx = {symbol: i for i, symbol in enumerate(dfa.alphabet)}
+    n, k = len(states), len(sym_idx)
+    
+    # Inverse transitions in CSR form: the predecessors of target t on symbol
+    # c are inv_src[inv_ptr[c * n + t]:inv_ptr[c * n + t + 1]]
+    sources = np.empty(len(dfa.transitions), dtype=np.int64)
+    keys = np.empty(len(dfa.transitions), dtype=np.int64)
+    for i, ((state, symbol), next_state) in enumerate(dfa.transitions.items()):
+        sources[i] = state_idx[state]
+        keys[i] = sym_idx[symbol] * n + state_idx[next_state]
+    order = np.argsort(keys, kind="stable")
+    inv_src = sources[order]
+    inv_ptr = np.zeros(n * k + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n * k), out=inv_ptr[1:])
+    
+    # Start from the accepting / non-accepting split
+    is_final = np.array([state in dfa.final_states for state in states], dtype=np.int64)
+    if 0 < is_final.sum() < n:
+        init_block, n_init = is_final, 2
+    else:
+        init_block, n_init = np.zeros(n, dtype=np.int64), 1
+    
+    block_of, n_blocks = _refine_blocks(inv_ptr, inv_src, init_block, n_init, n, k)
+    
+    partition = [set() for _ in range(n_blocks)]
+    for state, block in zip(states, block_of):
+        partition[block].add(state)
     
-    return result
+    return partition
+
+
+def _run_compiled(T, start, final_mask, symbols):
+    state = start
+    for symbol in symbols:
+        # Unknown symbols and missing transitions reject
+        if symbol < 0:
+            return False
+        state = T[state, symbol]
+        if state < 0:
+            return False
+    return final_mask[state]
+
+
+if njit is not None:
+    _run_compiled = njit(cache=True)(_run_compiled)
+    
+    @njit(cache=True)
+    def _refine_blocks(inv_ptr, inv_src, init_block, n_init, n, k):
+        # Refinable partition: the states of block b are elems[first[b]:end[b]]
+        # and its marked states are elems[first[b]:mid[b]]
+        elems = np.empty(n, dtype=np.int64)
+        loc = np.empty(n, dtype=np.int64)
+        block_of = init_block.copy()
+        first = np.zeros(n, dtype=np.int64)
+        end = np.zeros(n, dtype=np.int64)
+        mid = np.zeros(n, dtype=np.int64)
+        
+        for s in range(n):
+            end[block_of[s]] += 1
+        for b in range(1, n_init):
+            end[b] += end[b - 1]
+        for b in range(n_init):
+            first[b] = end[b - 1] if b > 0 else 0
+            mid[b] = first[b]
+        for s in range(n):
+            b = block_of[s]
+            elems[mid[b]] = s
+            loc[s] = mid[b]
+            mid[b] += 1
+        for b in range(n_init):
+            mid[b] = first[b]
+        n_blocks = n_init
+        
+        # Worklist of splitters encoded as block * k + symbol
+        stack = np.empty(n * k, dtype=np.int64)
+        top = 0
+        for b in range(n_init):
+            for c in range(k):
+                stack[top] = b * k + c
+                top += 1
+        
+        splitter = np.empty(n, dtype=np.int64)
+        touched = np.empty(n, dtype=np.int64)
+        
+        while top > 0:
+            top -= 1
+            code = stack[top]
+            B = code // k
+            c = code % k
+            
+            # Copy the splitter first since marking reorders states in place
+            size = end[B] - first[B]
+            splitter[:size] = elems[first[B]:end[B]]
+            
+            # Mark the states that move into the splitter on symbol c
+            n_touched = 0
+            for i in range(size):
+                key = c * n + splitter[i]
+                for j in range(inv_ptr[key], inv_ptr[key + 1]):
+                    s = inv_src[j]
+                    b = block_of[s]
+                    if loc[s] < mid[b]:
+                        continue
+                    if mid[b] == first[b]:
+                        touched[n_touched] = b
+                        n_touched += 1
+                    other = elems[mid[b]]
+                    elems[loc[s]] = other
+                    loc[other] = loc[s]
+                    elems[mid[b]] = s
+                    loc[s] = mid[b]
+                    mid[b] += 1
+            
+            # Split every touched block; the smaller half becomes the new block
+            for i in range(n_touched):
+                b = touched[i]
+                if mid[b] == end[b]:
+                    mid[b] = first[b]
+                    continue
+                nb = n_blocks
+                n_blocks += 1
+                if mid[b] - first[b] <= end[b] - mid[b]:
+                    first[nb] = first[b]
+                    end[nb] = mid[b]
+                    first[b] = mid[b]
+                else:
+                    first[nb] = mid[b]
+                    end[nb] = end[b]
+                    end[b] = mid[b]
+                mid[b] = first[b]
+                mid[nb] = first[nb]
+                for j in range(first[nb], end[nb]):
+                    block_of[elems[j]] = nb
+                for a in range(k):
+                    stack[top] = nb * k + a
+                    top += 1
+        
+        return block_of, n_blocks
+else:
+    _refine_blocks = None
 
 
 def create_minimized_dfa(dfa, partition):
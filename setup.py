@@ -13,6 +13,12 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/Khaledshahin321/test_package",
     packages=find_packages(),
+    install_requires=[
+        "numpy>=1.21.0",
+    ],
+    extras_require={
+        "jit": ["numba>=0.50.0"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -24,9 +24,12 @@ class TestCFGtoCNF(unittest.TestCase):
         # Verify that productions are in CNF form
         for var, prods in cnf.productions.items():
             for prod in prods:
-                if len(prod) == 1:
+                if len(prod) == 0:
+                    # S -> epsilon is only allowed for the start symbol
+                    self.assertEqual(var, cnf.start_symbol)
+                elif len(prod) == 1:
                     # A -> a form (terminal)
-                    self.assertTrue(prod in cnf.terminals)
+                    self.assertTrue(prod[0] in cnf.terminals)
                 elif len(prod) == 2:
                     # A -> BC form (two variables)
                     self.assertTrue(prod[0] in cnf.variables and prod[1] in cnf.variables)
@@ -52,10 +55,36 @@ class TestCFGtoCNF(unittest.TestCase):
         
         # Check that epsilon is eliminated
         for var, prods in new_cfg.productions.items():
-            self.assertNotIn("", prods)
+            self.assertNotIn((), prods)
         
         # Check that S -> B is added (since A can be epsilon)
-        self.assertIn("B", new_cfg.productions["S"])
+        self.assertIn(("B",), new_cfg.productions["S"])
+    
+    def test_indirect_nullable_elimination(self):
+        """Test elimination of variables that are nullable only through others."""
+        variables = {"S", "A", "B", "C"}
+        terminals = {"a", "b", "c"}
+        productions = {
+            "S": ["AC", "c"],
+            "A": ["BB", "a"],
+            "B": ["b", ""],  # B can derive epsilon, so A can too
+            "C": ["Ac"]
+        }
+        
+        cfg = CFG(variables, terminals, productions, "S")
+        converter = CNFConverter(cfg)
+        
+        self.assertEqual(converter.find_nullable_variables(), {"A", "B"})
+        
+        # Eliminate epsilon productions
+        new_cfg = converter.eliminate_epsilon_productions()
+        
+        # A is nullable through B, C is not nullable because of the terminal
+        self.assertIn(("C",), new_cfg.productions["S"])
+        self.assertNotIn(("A",), new_cfg.productions["S"])
+        self.assertIn(("c",), new_cfg.productions["C"])
+        self.assertIn(("B",), new_cfg.productions["A"])
+        self.assertEqual(new_cfg.start_symbol, "S")
     
     def test_unit_production_elimination(self):
         """Test elimination of unit productions."""
@@ -76,12 +105,12 @@ class TestCFGtoCNF(unittest.TestCase):
         # Check that unit productions are eliminated
         for var, prods in new_cfg.productions.items():
             for prod in prods:
-                self.assertFalse(prod in variables)
+                self.assertFalse(len(prod) == 1 and prod[0] in variables)
         
         # Check that transitive unit productions are handled
         # S -> A -> B -> b should become S -> b
-        self.assertIn("b", new_cfg.productions["S"])
-        self.assertIn("a", new_cfg.productions["S"])
+        self.assertIn(("b",), new_cfg.productions["S"])
+        self.assertIn(("a",), new_cfg.productions["S"])
     
     def test_long_production_breakdown(self):
         """Test breakdown of long productions."""
@@ -102,6 +131,146 @@ class TestCFGtoCNF(unittest.TestCase):
                 if len(prod) == 2:
                     self.assertTrue(prod[0] in cnf.variables and prod[1] in cnf.variables)
     
+    def test_multi_character_symbols(self):
+        """Test tokenization of productions using multi-character symbols."""
+        variables = {"S", "X10", "X1"}
+        terminals = {"a", "b"}
+        productions = {
+            "S": ["aX10X1", ("X1", "b")],
+            "X10": ["a"],
+            "X1": ["b"]
+        }
+        
+        cfg = CFG(variables, terminals, productions, "S")
+        
+        # Longest match picks X10 over X1, tuples are kept as they are
+        self.assertEqual(cfg.productions["S"], [("a", "X10", "X1"), ("X1", "b")])
+        
+        converter = CNFConverter(cfg)
+        cnf = converter.convert_to_cnf()
+        
+        for var, prods in cnf.productions.items():
+            for prod in prods:
+                self.assertTrue(1 <= len(prod) <= 2)
+                if len(prod) == 2:
+                    self.assertTrue(prod[0] in cnf.variables and prod[1] in cnf.variables)
+    
+    def test_shared_suffix_breakdown(self):
+        """Test that long productions with a common suffix share variables."""
+        variables = {"S", "A", "B", "C", "D"}
+        terminals = {"a", "b", "c", "d"}
+        productions = {
+            "S": ["ABCD", "BBCD"],
+            "A": ["a"],
+            "B": ["b"],
+            "C": ["c"],
+            "D": ["d"]
+        }
+        
+        cfg = CFG(variables, terminals, productions, "S")
+        converter = CNFConverter(cfg)
+        cnf = converter.convert_to_cnf()
+        
+        # Both productions end in BCD, so only the variables for BCD and CD are added
+        self.assertEqual(len(cnf.variables), len(variables) + 2)
+        first = {prod[1] for prod in cnf.productions["S"]}
+        self.assertEqual(len(first), 1)
+    
+    def test_cached_conversion(self):
+        """Test that repeated conversions return equal but independent grammars."""
+        variables = {"S", "A"}
+        terminals = {"a", "b"}
+        productions = {
+            "S": ["aSb", "A"],
+            "A": ["a", ""]
+        }
+        
+        first = CNFConverter(CFG(set(variables), terminals, productions, "S")).convert_to_cnf()
+        second = CNFConverter(CFG(set(variables), terminals, productions, "S")).convert_to_cnf()
+        
+        self.assertEqual(first.variables, second.variables)
+        self.assertEqual(first.start_symbol, second.start_symbol)
+        self.assertEqual({var: set(prods) for var, prods in first.productions.items()},
+                         {var: set(prods) for var, prods in second.productions.items()})
+        
+        # The converter state matches an uncached conversion
+        converter = CNFConverter(CFG(set(variables), terminals, productions, "S"))
+        converter.convert_to_cnf()
+        uncached = CNFConverter(CFG(set(variables), terminals, productions, "S"))
+        uncached.convert_to_cnf_uncached()
+        self.assertEqual(set(converter.terminal_to_var), {"a", "b"})
+        self.assertEqual(converter.terminal_to_var, uncached.terminal_to_var)
+        self.assertEqual(converter.suffix_cache, uncached.suffix_cache)
+        self.assertEqual(converter.new_var_counter, uncached.new_var_counter)
+        
+        # Changing one result must not leak into the cached copy
+        first.productions["S"].append(("b",))
+        first.variables.add("Z")
+        third = CNFConverter(CFG(set(variables), terminals, productions, "S")).convert_to_cnf()
+        self.assertNotIn(("b",), third.productions["S"])
+        self.assertNotIn("Z", third.variables)
+    
+    def test_cached_conversion_mixed_symbol_types(self):
+        """Test caching a grammar whose symbols cannot be ordered."""
+        variables = {"S", "A"}
+        terminals = {0, 1}
+        productions = {
+            "S": [(0, "A", 1), ("A",)],
+            "A": [(0,), ()]
+        }
+        
+        cfg = CFG(variables, terminals, productions, "S")
+        cnf = CNFConverter(cfg).convert_to_cnf()
+        expected = CNFConverter(CFG(variables, terminals, productions, "S")).convert_to_cnf_uncached()
+        
+        self.assertEqual(cnf.variables, expected.variables)
+        self.assertEqual({var: set(prods) for var, prods in cnf.productions.items()},
+                         {var: set(prods) for var, prods in expected.productions.items()})
+    
+    def test_repeated_uncached_conversion(self):
+        """Test that one converter can run the conversion more than once."""
+        variables = {"S", "A"}
+        terminals = {"a", "b"}
+        productions = {
+            "S": ["aAb", "ab"],
+            "A": ["a"]
+        }
+        
+        converter = CNFConverter(CFG(variables, terminals, productions, "S"))
+        first = converter.convert_to_cnf_uncached()
+        second = converter.convert_to_cnf_uncached()
+        
+        self.assertEqual(converter.cfg.variables, variables)
+        self.assertEqual(first.variables, second.variables)
+        self.assertEqual({var: set(prods) for var, prods in first.productions.items()},
+                         {var: set(prods) for var, prods in second.productions.items()})
+        
+        # Every variable used on a right-hand side has productions of its own
+        for var, prods in second.productions.items():
+            for prod in prods:
+                for symbol in prod:
+                    if symbol not in second.terminals:
+                        self.assertIn(symbol, second.variables)
+                        self.assertTrue(second.productions[symbol])
+    
+    def test_very_long_production_breakdown(self):
+        """Test breakdown of a production far longer than the recursion limit."""
+        variables = {"S", "A"}
+        terminals = {"a"}
+        productions = {
+            "S": [("A",) * 3000],
+            "A": ["a"]
+        }
+        
+        cfg = CFG(variables, terminals, productions, "S")
+        cnf = CNFConverter(cfg).convert_to_cnf_uncached()
+        
+        # A chain of 2998 new variables, each with one binary rule
+        self.assertEqual(len(cnf.variables), len(variables) + 2998)
+        for var, prods in cnf.productions.items():
+            for prod in prods:
+                self.assertTrue(1 <= len(prod) <= 2)
+    
     def test_terminal_replacement(self):
         """Test replacement of terminals in mixed productions."""
         variables = {"S"}
@@ -2,7 +2,12 @@
 Test cases for the DFA Minimizer.
 """
 
+import copy
+import pickle
 import unittest
+from unittest import mock
+
+import dfa_minimizer
 from dfa_minimizer import DFA
 
 class TestDFAMinimizer(unittest.TestCase):
@@ -100,6 +105,163 @@ class TestDFAMinimizer(unittest.TestCase):
         # So the minimal DFA should have 3 states
         self.assertEqual(len(minimized_dfa.states), 3)
     
+    def test_partial_dfa_minimization(self):
+        """Test minimization of a DFA with missing transitions."""
+        # q1 and q2 both accept 'a' and then die; q3 has no transitions at all
+        states = {'q0', 'q1', 'q2', 'q3'}
+        alphabet = {'a', 'b'}
+        transitions = {
+            ('q0', 'a'): 'q1',
+            ('q0', 'b'): 'q2',
+            ('q1', 'a'): 'q3',
+            ('q2', 'a'): 'q3'
+        }
+        start_state = 'q0'
+        final_states = {'q3'}
+        
+        dfa = DFA(states, alphabet, transitions, start_state, final_states)
+        minimized_dfa = dfa.minimize()
+        
+        # q1 and q2 should be merged
+        self.assertEqual(len(minimized_dfa.states), 3)
+        self.assertTrue(self.accepts(minimized_dfa, "aa"))
+        self.assertTrue(self.accepts(minimized_dfa, "ba"))
+        self.assertFalse(self.accepts(minimized_dfa, "ab"))
+        self.assertFalse(self.accepts(minimized_dfa, "aaa"))
+    
+    def test_transitions_mutation(self):
+        """Test that changing transitions after construction is picked up."""
+        dfa = DFA({'p', 'q'}, {'a'}, {('p', 'a'): 'p'}, 'p', {'q'})
+        self.assertFalse(dfa.accepts('a'))
+        self.assertEqual(len(dfa.minimize().states), 1)
+        
+        # Modify the transitions in place
+        dfa.transitions[('p', 'a')] = 'q'
+        self.assertTrue(dfa.accepts('a'))
+        minimized_dfa = dfa.minimize()
+        self.assertEqual(len(minimized_dfa.states), 2)
+        self.assertTrue(self.accepts(minimized_dfa, 'a'))
+        
+        # Replace the transitions entirely
+        dfa.transitions = {('p', 'a'): 'p'}
+        self.assertFalse(dfa.accepts('a'))
+        self.assertEqual(len(dfa.minimize().states), 1)
+    
+    def test_symbol_without_transitions(self):
+        """Test partitioning when an alphabet symbol has no transitions."""
+        states = {'q0', 'q1'}
+        alphabet = {'a'}
+        transitions = {('q0', 'a'): 'q1', ('q1', 'a'): 'q1'}
+        dfa = DFA(states, alphabet, transitions, 'q0', {'q1'})
+        self.assertEqual(len(dfa_minimizer.hopcroft_partition(dfa)), 2)
+        
+        # Growing the alphabet after construction must not break partitioning
+        dfa.alphabet.add('b')
+        self.assertEqual(len(dfa_minimizer.hopcroft_partition(dfa)), 2)
+        self.assertEqual(len(dfa.minimize().states), 2)
+    
+    def test_pickle_and_copy(self):
+        """Test that pickled and copied DFAs behave like the original."""
+        dfa = DFA({'a', 'b'}, {'x'}, {('a', 'x'): 'b'}, 'a', {'b'})
+        
+        restored = pickle.loads(pickle.dumps(dfa))
+        self.assertEqual(restored.transitions, dfa.transitions)
+        self.assertTrue(restored.accepts('x'))
+        
+        # Editing a deep copy must not affect the original and vice versa
+        copied = copy.deepcopy(dfa)
+        copied.transitions[('a', 'x')] = 'a'
+        self.assertFalse(copied.accepts('x'))
+        self.assertTrue(dfa.accepts('x'))
+    
+    def test_compiled_runner(self):
+        """Test that the generated runner agrees with accepts()."""
+        # DFA for binary strings with an even number of '1's, '2' has no transitions
+        states = {'even', 'odd'}
+        alphabet = {'0', '1', '2'}
+        transitions = {
+            ('even', '0'): 'even',
+            ('even', '1'): 'odd',
+            ('odd', '0'): 'odd',
+            ('odd', '1'): 'even'
+        }
+        dfa = DFA(states, alphabet, transitions, 'even', {'even'})
+        run = dfa.compile_runner()
+        
+        for input_string in ["", "0", "1", "11", "101", "1001", "12", "x"]:
+            self.assertEqual(run(input_string), dfa.accepts(input_string), input_string)
+        self.assertTrue(run("0110"))
+        self.assertFalse(run("0111"))
+    
+    def test_compiled_runner_large_dfa(self):
+        """Test the generated runner on many states and a wide alphabet."""
+        # Counter modulo 3000 on '+', reset on '0'; accepting at multiples of 7
+        n = 3000
+        states = set(range(n))
+        alphabet = {'+', '0'}
+        transitions = {}
+        for i in range(n):
+            transitions[(i, '+')] = (i + 1) % n
+            transitions[(i, '0')] = 0
+        dfa = DFA(states, alphabet, transitions, 0, {i for i in range(n) if i % 7 == 0})
+        run = dfa.compile_runner()
+        
+        for input_string in ["", "+", "+" * 7, "+" * 3001, "+" * 14 + "0", "+" * 6 + "x"]:
+            self.assertEqual(run(input_string), dfa.accepts(input_string), len(input_string))
+        
+        # One state with more transitions than RUNNER_MAX_BRANCHES, one with exactly that many
+        wide = dfa_minimizer.RUNNER_MAX_BRANCHES + 1
+        alphabet = {str(i) for i in range(wide)}
+        transitions = {('s', symbol): 't' for symbol in alphabet}
+        transitions.update({('t', str(i)): 's' for i in range(wide - 1)})
+        dfa = DFA({'s', 't'}, alphabet, transitions, 's', {'t'})
+        run = dfa.compile_runner()
+        
+        # Symbols such as '16' span several characters, so inputs are lists
+        for symbols in [["0"], [str(wide - 1)], ["0", "0"], ["0", str(wide - 1)], ["x"]]:
+            self.assertEqual(run(symbols), dfa.accepts(symbols), symbols)
+        self.assertTrue(run([str(wide - 1)]))
+        self.assertFalse(run(["0", str(wide - 1)]))
+    
+    @unittest.skipIf(dfa_minimizer.njit is None, "Numba is not installed")
+    def test_jit_partition_matches_python(self):
+        """Test that the Numba kernel finds the same partition as pure Python."""
+        # Cycle of 300 states on 'a' where every third state is accepting and
+        # even states reset to state 0 on 'b'; states differ only by position mod 6
+        n = 300
+        states = set(range(n))
+        alphabet = {'a', 'b'}
+        transitions = {}
+        for i in range(n):
+            transitions[(i, 'a')] = (i + 1) % n
+            if i % 2 == 0:
+                transitions[(i, 'b')] = 0
+        start_state = 0
+        final_states = {i for i in range(n) if i % 3 == 0}
+        
+        dfa = DFA(states, alphabet, transitions, start_state, final_states)
+        expected = sorted(sorted(group) for group in dfa_minimizer.hopcroft_partition(dfa))
+        actual = sorted(sorted(group) for group in dfa_minimizer.hopcroft_partition_jit(dfa))
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(expected), 6)
+        self.assertEqual(len(dfa.minimize().states), len(expected))
+    
+    def test_jit_partition_without_numba(self):
+        """Test that the JIT entry point falls back to pure Python without Numba."""
+        states = {'q0', 'q1', 'q2'}
+        alphabet = {'a'}
+        transitions = {
+            ('q0', 'a'): 'q1',
+            ('q1', 'a'): 'q2',
+            ('q2', 'a'): 'q2'
+        }
+        dfa = DFA(states, alphabet, transitions, 'q0', {'q1', 'q2'})
+        
+        with mock.patch.object(dfa_minimizer, '_refine_blocks', None):
+            partition = dfa_minimizer.hopcroft_partition_jit(dfa)
+        self.assertEqual(sorted(sorted(group) for group in partition),
+                         [['q0'], ['q1', 'q2']])
+    
     def accepts(self, dfa, input_string):
         """
         Check if the DFA accepts the given input string.
@@ -111,14 +273,7 @@ class TestDFAMinimizer(unittest.TestCase):
         Returns:
             bool: True if the DFA accepts the string, False otherwise
         """
-        current_state = dfa.start_state
-        
-        for symbol in input_string:
-            if (current_state, symbol) not in dfa.transitions:
-                return False
-            current_state = dfa.transitions[(current_state, symbol)]
-        
-        return current_state in dfa.final_states
+        return DFA.accepts_compiled(dfa.compile(), input_string)
 
 
 if __name__ == '__main__':